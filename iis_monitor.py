@@ -1,21 +1,66 @@
 
 
 import os
+import asyncio
 import subprocess
 import threading
 import time
 import re
 import json
+import queue
+import hashlib
+import logging
+from collections import deque
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from itertools import islice
 from dataclasses import dataclass, asdict, field
+from types import MappingProxyType
 from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import gradio as gr
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter, Retry
+
+# verify=False 的探测每次都会触发 InsecureRequestWarning 的过滤逻辑，启动时关掉一次
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+# 诊断日志：默认WARNING不输出，调试时在 __main__ 里把级别调到DEBUG
+logger = logging.getLogger(__name__)
+
+# 可选加速：aiohttp 可在单个事件循环里并发全部HTTP探测 (keep-alive + DNS缓存)，
+# 站点很多时省去线程栈开销；未安装则继续用线程池 + requests
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# 可选加速：orjson 为C实现的JSON编解码器，比标准库快数倍；未安装则回退标准库
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 可选加速：装有 pythonnet 时直接调用 Microsoft.Web.Administration，
+# 省去每次查询 fork appcmd.exe + 解码 + 正则解析；未安装则走原 appcmd 路径
+try:
+    import clr
+    clr.AddReference("Microsoft.Web.Administration")
+    from Microsoft.Web.Administration import ServerManager
+    _HAS_SERVER_MANAGER = True
+except Exception:
+    ServerManager = None
+    _HAS_SERVER_MANAGER = False
 
 # ============================================
 # 配置常量
 # ============================================
-APP_CMD = r"%windir%\system32\inetsrv\appcmd.exe"
+# 启动时展开一次环境变量，后续以绝对路径直接调用，无需经过cmd.exe
+APP_CMD = os.path.expandvars(r"%windir%\system32\inetsrv\appcmd.exe")
+if not os.path.exists(APP_CMD):
+    print(f"警告: 未找到 {APP_CMD}，请确认已安装 IIS 管理脚本和工具")
 CONFIG_FILE = "iis_monitor_config.json"
 LOG_FILE = "iis_monitor.log"
 STATS_FILE = "iis_monitor_stats.json"
@@ -48,6 +93,40 @@ textarea {
     font-family: "Consolas", "Monaco", "Courier New", monospace !important;
 }
 """
+# 压缩空白后注入页面，少传一点、浏览器解析也快一点；源码里保留可读版本
+custom_css = re.sub(r"\s+", " ", custom_css).strip()
+
+# 主题对象构建一次即可，launch 时直接复用
+_THEME = gr.themes.Soft()
+
+# 配置文本框的空白串与示例串：模块加载时定好，不在每次请求里重新拼
+_EMPTY_CONF_JSON = '{\n  \n}'
+_EXAMPLE_WEB_JSON = """{
+	"Example Web Site": {
+		"url": "http://localhost:80",
+		"enabled": true,
+		"check_timeout": 10,
+		"expected_status": 200
+	},
+	"ExampleWebsite": {
+		"url": "http://localhost:8080",
+		"enabled": true,
+		"check_timeout": 15,
+		"expected_status": 200
+	}
+}"""
+_EXAMPLE_POOL_JSON = """{
+	"ExampleAppPool": {
+		"enabled": true,
+		"auto_restart": true,
+		"restart_delay": 5
+	},
+	"MyExampleAppPool": {
+		"enabled": true,
+		"auto_restart": true,
+		"restart_delay": 10
+	}
+}"""
 
 # ============================================
 # 数据类定义
@@ -67,6 +146,17 @@ class AppPoolConfig:
     auto_restart: bool = True
     restart_delay: int = 5
 
+# 配置字段与默认值：序列化时按此单遍 getattr 构建输出字典，
+# 不走 asdict 的递归拷贝，也不像旧的 vars()+setdefault 那样改动活对象的 __dict__
+_WEB_DEFAULTS = (("url", ""), ("enabled", True), ("check_timeout", 10), ("expected_status", 200))
+_POOL_DEFAULTS = (("enabled", True), ("auto_restart", True), ("restart_delay", 5))
+
+def _web_conf_dict(websites: Dict[str, WebsiteConfig]) -> Dict[str, Dict]:
+    return {name: {k: getattr(c, k, d) for k, d in _WEB_DEFAULTS} for name, c in websites.items()}
+
+def _pool_conf_dict(app_pools: Dict[str, AppPoolConfig]) -> Dict[str, Dict]:
+    return {name: {k: getattr(c, k, d) for k, d in _POOL_DEFAULTS} for name, c in app_pools.items()}
+
 @dataclass
 class MonitorStatus:
     status: str = "stopped"  # stopped, running, error
@@ -86,6 +176,27 @@ class StatsData:
 # ============================================
 # 工具函数
 # ============================================
+# appcmd 输出解析正则 (模块加载时编译一次，热循环中直接复用)
+_SITE_RE = re.compile(r'SITE "([^"]+)" \(id:(\d+),bindings:([^)]+),state:(\w+)\)')
+_POOL_RE = re.compile(r'APPPOOL "([^"]+)" \(MgdVersion:([^,]+),MgdMode:([^,]+),state:(\w+)\)')
+_POOL_SIMPLE_RE = re.compile(r'APPPOOL "([^"]+)"')
+_BINDINGS_RE = re.compile(r'bindings:([^)]+)')
+_HTTP_BINDING_RE = re.compile(r'http/([^:]+):(\d+):')
+_APPPOOL_ATTR_RE = re.compile(r'applicationPool:"([^"]+)"')
+_SITE_RECORD_RE = re.compile(r'bindings:([^)]+)\).*?applicationPool:"([^"]+)"', re.S)
+
+def _dumps(obj) -> str:
+    """带缩进的JSON序列化 (优先orjson；orjson默认不转义非ASCII，中文原样保留)"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
+def _loads(data):
+    """JSON反序列化 (优先orjson，接受str或bytes)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 def get_today_date() -> str:
     return datetime.now().strftime("%Y-%m-%d")
 
@@ -99,26 +210,76 @@ def run_appcmd(*args) -> tuple[bool, str]:
     """执行 appcmd 命令，增强稳定性"""
     try:
         cmd = [APP_CMD] + list(args)
+        # 绝对路径 + shell=False：每次调用少fork一个cmd.exe，也避免引号转义问题
         result = subprocess.run(
             cmd,
-            shell=True,
+            shell=False,
             capture_output=True,
-            text=True,
-            timeout=30,
-            encoding='gbk', # 尝试使用GBK编码处理Windows输出
-            errors='ignore'  # 忽略编码错误
+            timeout=30
         )
-        # 如果GBK失败，尝试UTF-8
-        if not result.stdout and result.stderr:
-             result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=30, encoding='utf-8', errors='ignore')
-        
-        return result.returncode == 0, result.stdout
+        # 一次性以字节读取，先按GBK解码(Windows控制台默认)，失败再退回UTF-8，
+        # 避免为了换编码重新fork一次appcmd
+        try:
+            stdout = result.stdout.decode('gbk')
+        except UnicodeDecodeError:
+            stdout = result.stdout.decode('utf-8', 'ignore')
+
+        return result.returncode == 0, stdout
     except subprocess.TimeoutExpired:
         return False, "命令执行超时"
     except Exception as e:
         return False, str(e)
 
+# IIS 拓扑快照缓存：UI每秒轮询/点击刷新时不必每次都fork appcmd
+IIS_CACHE_TTL = 5.0
+_iis_cache: Dict[str, tuple] = {}  # {key: (时间戳, 结果)}
+_iis_cache_lock = threading.Lock()
+
+def invalidate_iis_cache():
+    """配置保存或启停/重启操作后调用，确保下一次查询返回最新状态"""
+    with _iis_cache_lock:
+        _iis_cache.clear()
+
+def _cached_iis_list(key: str, fetch):
+    now = time.monotonic()
+    with _iis_cache_lock:
+        hit = _iis_cache.get(key)
+        if hit and now - hit[0] < IIS_CACHE_TTL:
+            return hit[1]
+    value = fetch()
+    with _iis_cache_lock:
+        _iis_cache[key] = (time.monotonic(), value)
+    return value
+
 def get_iis_sites() -> List[Dict[str, any]]:
+    return _cached_iis_list("sites", _fetch_iis_sites)
+
+def get_iis_app_pools() -> List[Dict[str, any]]:
+    return _cached_iis_list("pools", _fetch_iis_app_pools)
+
+def _sm_fetch_sites() -> List[Dict[str, any]]:
+    """通过 ServerManager 进程内读取网站列表，格式与 appcmd 解析结果一致"""
+    sites = []
+    for s in ServerManager().Sites:
+        bindings = ",".join(f"{b.Protocol}/{b.BindingInformation}" for b in s.Bindings)
+        sites.append({"name": s.Name, "id": str(s.Id), "bindings": bindings, "state": str(s.State)})
+    return sites
+
+def _sm_fetch_pools() -> List[Dict[str, any]]:
+    """通过 ServerManager 进程内读取应用池列表"""
+    return [{"name": p.Name,
+             "version": p.ManagedRuntimeVersion or "Unknown",
+             "mode": str(p.ManagedPipelineMode),
+             "state": str(p.State)}
+            for p in ServerManager().ApplicationPools]
+
+def _fetch_iis_sites() -> List[Dict[str, any]]:
+    if _HAS_SERVER_MANAGER:
+        try:
+            return _sm_fetch_sites()
+        except Exception as e:
+            print(f"ServerManager 读取网站失败，回退 appcmd: {e}")
+
     success, output = run_appcmd("list", "site")
     if not success:
         print(f"获取网站失败: {output}")
@@ -128,13 +289,19 @@ def get_iis_sites() -> List[Dict[str, any]]:
     for line in output.strip().split('\n'):
         if not line.strip(): continue
         # 格式: SITE "Default Web Site" (id:1,bindings:http/*:80:,state:Started)
-        match = re.match(r'SITE "([^"]+)" \(id:(\d+),bindings:([^)]+),state:(\w+)\)', line)
+        match = _SITE_RE.match(line)
         if match:
             name, site_id, bindings, state = match.groups()
             sites.append({"name": name, "id": site_id, "bindings": bindings, "state": state})
     return sites
 
-def get_iis_app_pools() -> List[Dict[str, any]]:
+def _fetch_iis_app_pools() -> List[Dict[str, any]]:
+    if _HAS_SERVER_MANAGER:
+        try:
+            return _sm_fetch_pools()
+        except Exception as e:
+            print(f"ServerManager 读取应用池失败，回退 appcmd: {e}")
+
     success, output = run_appcmd("list", "apppool")
     if not success:
         print(f"获取应用池失败: {output}")
@@ -143,13 +310,13 @@ def get_iis_app_pools() -> List[Dict[str, any]]:
     app_pools = []
     for line in output.strip().split('\n'):
         if not line.strip(): continue
-        match = re.match(r'APPPOOL "([^"]+)" \(MgdVersion:([^,]+),MgdMode:([^,]+),state:(\w+)\)', line)
+        match = _POOL_RE.match(line)
         if match:
             name, version, mode, state = match.groups()
             app_pools.append({"name": name, "version": version, "mode": mode, "state": state})
         else:
             # 兼容性处理：如果标准正则不匹配，尝试简单提取
-            simple_match = re.search(r'APPPOOL "([^"]+)"', line)
+            simple_match = _POOL_SIMPLE_RE.search(line)
             if simple_match:
                 name = simple_match.group(1)
                 app_pools.append({"name": name, "version": "Unknown", "mode": "Unknown", "state": "Unknown"})
@@ -157,6 +324,14 @@ def get_iis_app_pools() -> List[Dict[str, any]]:
     return app_pools
 
 def get_app_pool_state(app_pool_name: str) -> str:
+    if _HAS_SERVER_MANAGER:
+        try:
+            pool = ServerManager().ApplicationPools[app_pool_name]
+            if pool is not None:
+                return str(pool.State)
+        except Exception:
+            pass  # 回退 appcmd
+
     success, output = run_appcmd("list", "apppool", app_pool_name)
     if success and "Started" in output:
         return "Started"
@@ -167,54 +342,100 @@ def get_app_pool_state(app_pool_name: str) -> str:
 def restart_website(site_name: str, delay: int = 5) -> bool:
     """
     使用 appcmd 重启网站
+    delay 作为就绪轮询的上限：一旦站点进入 Stopped 就立即启动，不再固定睡满
     """
     try:
+        if _HAS_SERVER_MANAGER:
+            try:
+                site = ServerManager().Sites[site_name]
+                if site is not None:
+                    site.Stop()
+                    deadline = time.monotonic() + delay
+                    while str(site.State) != "Stopped" and time.monotonic() < deadline:
+                        time.sleep(0.1)
+                    site.Start()
+                    invalidate_iis_cache()
+                    return True
+            except Exception as e:
+                print(f"ServerManager 重启网站失败，回退 appcmd: {e}")
+
         # 先停止
         run_appcmd("stop", "site", site_name)
-        # 等待
-        time.sleep(delay)
+        # 轮询等待进入 Stopped (最多delay秒)，而不是无条件睡满
+        deadline = time.monotonic() + delay
+        while time.monotonic() < deadline:
+            success, output = run_appcmd("list", "site", site_name)
+            if success and "Stopped" in output:
+                break
+            time.sleep(0.1)
         # 再启动
         success, _ = run_appcmd("start", "site", site_name)
+        invalidate_iis_cache()
         return success
     except Exception as e:
         print(f"重启网站 {site_name} 失败: {e}")
         return False
 
 def restart_app_pool(app_pool_name: str, delay: int = 5) -> bool:
+    """重启应用池：运行中的池用 recycle 原子完成stop+start，无需等待；
+    已停止的池 recycle 无效，直接 start。delay 参数保留以兼容旧调用"""
     try:
-        run_appcmd("stop", "apppool", app_pool_name)
-        time.sleep(delay)
-        success, _ = run_appcmd("start", "apppool", app_pool_name)
+        if _HAS_SERVER_MANAGER:
+            try:
+                pool = ServerManager().ApplicationPools[app_pool_name]
+                if pool is not None:
+                    if str(pool.State) == "Started":
+                        pool.Recycle()
+                    else:
+                        pool.Start()
+                    invalidate_iis_cache()
+                    return True
+            except Exception as e:
+                print(f"ServerManager 重启应用池失败，回退 appcmd: {e}")
+
+        success, _ = run_appcmd("recycle", "apppool", app_pool_name)
+        if not success:
+            success, _ = run_appcmd("start", "apppool", app_pool_name)
+        invalidate_iis_cache()
         return success
     except Exception:
         return False
 
+def parse_bindings_url(bindings: str) -> Optional[str]:
+    """从 bindings 字符串解析出可访问的 http URL"""
+    http_match = _HTTP_BINDING_RE.search(bindings)
+    if http_match:
+        ip = http_match.group(1)
+        port = http_match.group(2)
+        hostname = "localhost" if ip == "*" or ip == "" else ip
+        return f"http://{hostname}:{port}"
+    return None
+
+def parse_site_record(output: str) -> tuple:
+    """单遍扫描 'list site <name>' 输出，同时取出 (绑定URL, 应用池名)"""
+    match = _SITE_RECORD_RE.search(output)
+    if match:
+        return parse_bindings_url(match.group(1)), match.group(2)
+    # 输出中没有applicationPool属性时，退化为各自单独提取
+    bindings = _BINDINGS_RE.search(output)
+    pool = _APPPOOL_ATTR_RE.search(output)
+    return (parse_bindings_url(bindings.group(1)) if bindings else None,
+            pool.group(1) if pool else None)
+
+def _query_site_record(site_name: str) -> tuple:
+    success, output = run_appcmd("list", "site", site_name)
+    if not success: return None, None
+    return parse_site_record(output)
+
 def get_site_bindings_url(site_name: str) -> Optional[str]:
     try:
-        success, output = run_appcmd("list", "site", site_name)
-        if not success: return None
-        
-        match = re.search(r'bindings:([^)]+)', output)
-        if not match: return None
-        
-        bindings = match.group(1)
-        http_match = re.search(r'http/([^:]+):(\d+):', bindings)
-        if http_match:
-            ip = http_match.group(1)
-            port = http_match.group(2)
-            hostname = "localhost" if ip == "*" or ip == "" else ip
-            return f"http://{hostname}:{port}"
-        return None
+        return _query_site_record(site_name)[0]
     except Exception:
         return None
 
 def get_site_app_pool(site_name: str) -> Optional[str]:
     try:
-        success, output = run_appcmd("list", "site", site_name)
-        if not success: return None
-        match = re.search(r'applicationPool:"([^"]+)"', output)
-        if match: return match.group(1)
-        return None
+        return _query_site_record(site_name)[1]
     except Exception:
         return None
 
@@ -224,24 +445,54 @@ def get_site_app_pool(site_name: str) -> Optional[str]:
 class LogManager:
     def __init__(self, log_file: str = LOG_FILE):
         self.log_file = log_file
-        self.memory_logs: List[str] = []
+        # 有界环形缓冲：写满后自动丢弃最老一条，O(1)，不再有 pop(0) 的 O(N) 搬移
+        self.memory_logs: deque = deque(maxlen=MAX_LOG_LINES)
+        self.seq = 0  # 日志序号，UI据此判断是否有新日志
         self.lock = threading.Lock()
-    
+        # 文件写入移到后台线程：保持句柄常开、批量落盘，日志高峰不再阻塞调用方
+        self._q = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._drain, daemon=True)
+        self._writer.start()
+
+    def _drain(self):
+        """后台写入线程：凑批写文件，减少 open/write/close 次数"""
+        f = None
+        while True:
+            batch = [self._q.get()]
+            try:
+                for _ in range(63):  # 单批最多64条
+                    batch.append(self._q.get_nowait())
+            except queue.Empty:
+                pass
+            # 句柄常开；打开失败(文件被占用/暂时不可写)不放弃，每批都重试
+            if f is None:
+                try:
+                    f = open(self.log_file, "a", encoding="utf-8", buffering=1 << 16)
+                except Exception:
+                    continue
+            try:
+                f.write("\n".join(batch) + "\n")
+                f.flush()
+            except Exception:
+                # 写失败多半是句柄已失效：关掉重开，下一批走新句柄
+                try:
+                    f.close()
+                except Exception:
+                    pass
+                f = None
+
     def log(self, message: str, level: str = "INFO"):
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         log_entry = f"[{timestamp}] [{level}] {message}"
         with self.lock:
             self.memory_logs.append(log_entry)
-            if len(self.memory_logs) > MAX_LOG_LINES: self.memory_logs.pop(0)
-            try:
-                with open(self.log_file, "a", encoding="utf-8") as f:
-                    f.write(log_entry + "\n")
-            except: pass
+            self.seq += 1
+        self._q.put(log_entry)
         print(log_entry) # 控制台输出
     
     def get_recent_logs(self, count: int = 50) -> List[str]:
         with self.lock:
-            return self.memory_logs[-count:] if len(self.memory_logs) > count else self.memory_logs.copy()
+            return list(islice(self.memory_logs, max(0, len(self.memory_logs) - count), len(self.memory_logs)))
 
 class ConfigManager:
     def __init__(self):
@@ -251,40 +502,91 @@ class ConfigManager:
         self.check_interval = 60
         self.max_failures = 3
         self.global_auto_restart = True
+        # 序列化结果缓存：配置不变时页面打开直接复用，不重复dumps
+        # 重建/失效都在锁内，防止保存线程和页面加载线程交错看到半新半旧的缓存
+        self._web_json_cache: Optional[str] = None
+        self._pool_json_cache: Optional[str] = None
+        self._json_cache_lock = threading.Lock()
+        # batch_update() 置位时 save() 变成空操作，退出时统一落盘一次
+        self._suspend_save = False
         self.load()
+
+    def web_json(self) -> str:
+        """网站配置的JSON字符串 (带缓存)"""
+        with self._json_cache_lock:
+            if self._web_json_cache is None:
+                self._web_json_cache = _dumps(_web_conf_dict(self.websites))
+            return self._web_json_cache
+
+    def pool_json(self) -> str:
+        """应用池配置的JSON字符串 (带缓存)"""
+        with self._json_cache_lock:
+            if self._pool_json_cache is None:
+                self._pool_json_cache = _dumps(_pool_conf_dict(self.app_pools))
+            return self._pool_json_cache
+
+    def invalidate_json_caches(self):
+        """作废序列化缓存，下次访问时惰性重建"""
+        with self._json_cache_lock:
+            self._web_json_cache = None
+            self._pool_json_cache = None
     
-    def add_website(self, config: WebsiteConfig):
-        self.websites = config
+    @contextmanager
+    def batch_update(self):
+        """批量修改配置：块内所有 save() 挂起，正常退出时只写盘一次。
+
+        块内抛异常则不落盘：改了一半的配置留在内存里由调用方处理，
+        不能把半套配置写进文件。
+        """
+        self._suspend_save = True
+        try:
+            yield self
+        except BaseException:
+            self._suspend_save = False
+            raise
+        self._suspend_save = False
         self.save()
-        
-    def add_app_pool(self, config: AppPoolConfig):
-        self.app_pools = config
+
+    def add_website(self, name: str, config: WebsiteConfig):
+        self.websites[name] = config
+        self.save()
+
+    def add_app_pool(self, name: str, config: AppPoolConfig):
+        self.app_pools[name] = config
         self.save()
     
     def save(self):
+        if self._suspend_save:
+            return
         try:
             data = {
-                "websites": {k: asdict(v) for k, v in self.websites.items()},
-                "app_pools": {k: asdict(v) for k, v in self.app_pools.items()},
+                "websites": _web_conf_dict(self.websites),
+                "app_pools": _pool_conf_dict(self.app_pools),
                 "check_interval": self.check_interval,
                 "max_failures": self.max_failures,
                 "global_auto_restart": self.global_auto_restart
             }
-            with open(self.config_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            with open(self.config_file, "wb") as f:
+                f.write(_dumps(data).encode("utf-8"))
+            # 同步刷新序列化缓存 (子字典已在手边，顺手重建)
+            with self._json_cache_lock:
+                self._web_json_cache = _dumps(data["websites"])
+                self._pool_json_cache = _dumps(data["app_pools"])
         except Exception as e:
             print(f"保存配置失败: {e}")
 
     def load(self):
         try:
             if not os.path.exists(self.config_file): return
-            with open(self.config_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            self.websites = {k: WebsiteConfig(**v) for k, v in data.get("websites", {}).items()}
-            self.app_pools = {k: AppPoolConfig(**v) for k, v in data.get("app_pools", {}).items()}
+            with open(self.config_file, "rb") as f:
+                data = _loads(f.read())
+            # 只接受dict形状的条目，防止坏配置让后续循环迭代到错误类型
+            self.websites = {k: WebsiteConfig(**v) for k, v in data.get("websites", {}).items() if isinstance(v, dict)}
+            self.app_pools = {k: AppPoolConfig(**v) for k, v in data.get("app_pools", {}).items() if isinstance(v, dict)}
             self.check_interval = data.get("check_interval", 60)
             self.max_failures = data.get("max_failures", 3)
             self.global_auto_restart = data.get("global_auto_restart", True)
+            self.invalidate_json_caches()  # 惰性重建
         except Exception as e:
             print(f"加载配置失败: {e}")
 
@@ -295,29 +597,54 @@ class IISMonitor:
     def __init__(self):
         self.config_manager = ConfigManager()
         self.logger = LogManager()
-        
+
+        # HTTP 连接池 (复用连接，避免每次检测重新建立 TCP/TLS)
+        self.http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=Retry(total=0))
+        self.http.mount("http://", adapter)
+        self.http.mount("https://", adapter)
+        self._binding_url_cache: Dict[str, str] = {}  # 站点绑定URL缓存 (配置变更时重置)
+        self._needs_get: set = set()  # 不支持HEAD(405/501)的站点，后续直接用GET
+        self._prepared: Dict[tuple, requests.PreparedRequest] = {}  # 预构造请求，免去每次URL解析/头合并
+
+        # aiohttp 检测用的事件循环与会话 (仅监控线程使用，懒创建)
+        self._aio_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._aio_session = None
+
         # 线程控制
         self.running = False
         self.stop_event = threading.Event()
+        self.wake = threading.Event()  # 配置保存/停止时提前唤醒监控循环
         self.monitor_thread: Optional[threading.Thread] = None
+        self.pool: Optional[ThreadPoolExecutor] = None  # 检测线程池 (start时创建)
         self.lock = threading.RLock() # 使用可重入锁
         
         # 状态数据
         self.status = MonitorStatus()
+        self._start_monotonic: float = 0.0  # 运行时长用monotonic计算，避免每轮strptime
         self.website_status: Dict[str, Dict] = {} # {name: {status, fail_count, last_check...}}
         self.apppool_status: Dict[str, Dict] = {}
+        self._rows_version = 0  # 状态表版本号，UI据此跳过未变化的表格重绘
         
         self._init_status()
 
     def _init_status(self):
-        """初始化状态字典"""
+        """初始化状态字典 (构建新副本后整体替换发布)"""
         with self.lock:
+            self._binding_url_cache.clear()
+            self._needs_get.clear()
+            self._prepared.clear()
+            new_ws = {k: dict(v) for k, v in self.website_status.items()}
+            new_ps = {k: dict(v) for k, v in self.apppool_status.items()}
             for name in self.config_manager.websites:
-                if name not in self.website_status:
-                    self.website_status[name] = {"status": "unknown", "fail_count": 0, "last_check": "-", "total_checks": 0}
+                if name not in new_ws:
+                    new_ws[name] = {"status": "unknown", "fail_count": 0, "last_check": "-", "total_checks": 0}
             for name in self.config_manager.app_pools:
-                if name not in self.apppool_status:
-                    self.apppool_status[name] = {"status": "unknown", "fail_count": 0, "last_check": "-", "total_checks": 0}
+                if name not in new_ps:
+                    new_ps[name] = {"status": "unknown", "fail_count": 0, "last_check": "-", "total_checks": 0}
+            self.website_status = new_ws
+            self.apppool_status = new_ps
+            self._rows_version += 1
 
     def start(self) -> tuple[bool, str]:
         if self.running:
@@ -331,10 +658,15 @@ class IISMonitor:
             status="running",
             start_time=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         )
+        self._start_monotonic = time.monotonic()
         
         self._init_status()
         self.logger.log("监控已启动", "INFO")
-        
+
+        # 检测线程池：并发执行HTTP探测和appcmd查询，周期耗时由总和降为最慢一项
+        target_count = len(self.config_manager.websites) + len(self.config_manager.app_pools)
+        self.pool = ThreadPoolExecutor(max_workers=min(32, 4 + target_count))
+
         self.monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
         self.monitor_thread.start()
         return True, "监控已启动"
@@ -346,10 +678,26 @@ class IISMonitor:
         self.logger.log("正在停止监控...", "INFO")
         self.running = False # 标志位先置为False，防止循环继续
         self.stop_event.set()
+        self.wake.set()  # 立即结束本轮等待
         
         if self.monitor_thread and self.monitor_thread.is_alive():
             self.monitor_thread.join(timeout=5)
-        
+
+        if self.pool:
+            self.pool.shutdown(wait=False)
+            self.pool = None
+
+        # 关闭 aiohttp 会话与事件循环 (监控线程已join，此处独占)
+        if self._aio_loop is not None:
+            try:
+                if self._aio_session is not None:
+                    self._aio_loop.run_until_complete(self._aio_session.close())
+                self._aio_loop.close()
+            except Exception:
+                pass
+            self._aio_loop = None
+            self._aio_session = None
+
         # 强制重置显示状态
         with self.lock:
             self.status.status = "stopped"
@@ -364,80 +712,172 @@ class IISMonitor:
             try:
                 self._check_cycle()
                 
-                # 更新运行时长
+                # 更新运行时长 (monotonic差值，无需反复解析时间字符串)
                 if self.status.start_time:
-                    start_dt = datetime.strptime(self.status.start_time, "%Y-%m-%d %H:%M:%S")
-                    self.status.uptime_seconds = (datetime.now() - start_dt).total_seconds()
+                    self.status.uptime_seconds = time.monotonic() - self._start_monotonic
                 
-                self.stop_event.wait(self.config_manager.check_interval)
+                # 可被唤醒的等待：配置保存后立刻开始新一轮检测，不必等完整个间隔
+                self.wake.wait(self.config_manager.check_interval)
+                self.wake.clear()
             except Exception as e:
                 self.logger.log(f"监控循环异常: {str(e)}", "ERROR")
                 time.sleep(5)
 
+    def _check_one_site(self, name, cfg) -> bool:
+        """检测单个网站是否正常 (在线程池中执行)"""
+        try:
+            url = cfg.url if cfg.url else self._binding_url_cache.get(name)
+            if not url:
+                url = get_site_bindings_url(name) or "http://localhost"
+                self._binding_url_cache[name] = url
+
+            # 只看状态码，HEAD即可，省去响应体传输；不支持HEAD的站点记住后改用GET
+            method = "GET" if name in self._needs_get else "HEAD"
+            resp = self.http.send(self._prepared_for(method, url),
+                                  timeout=cfg.check_timeout, verify=False, allow_redirects=True)
+            if method == "HEAD" and resp.status_code in (405, 501):
+                self._needs_get.add(name)
+                resp = self.http.send(self._prepared_for("GET", url),
+                                      timeout=cfg.check_timeout, verify=False, allow_redirects=True)
+            return resp.status_code == cfg.expected_status
+        except Exception:
+            return False
+
+    def _prepared_for(self, method: str, url: str) -> requests.PreparedRequest:
+        """按 (method, url) 缓存 PreparedRequest，跳过每次检测的URL解析和头合并"""
+        key = (method, url)
+        prep = self._prepared.get(key)
+        if prep is None:
+            prep = self.http.prepare_request(requests.Request(method, url))
+            self._prepared[key] = prep
+        return prep
+
+    async def _check_site_async(self, name, cfg) -> bool:
+        """aiohttp 版单站点检测 (在监控线程的事件循环中执行)"""
+        try:
+            url = cfg.url if cfg.url else self._binding_url_cache.get(name)
+            if not url:
+                url = await asyncio.to_thread(get_site_bindings_url, name) or "http://localhost"
+                self._binding_url_cache[name] = url
+
+            timeout = aiohttp.ClientTimeout(total=cfg.check_timeout)
+            # 同样优先HEAD，405/501时记住该站点需要GET
+            if name not in self._needs_get:
+                async with self._aio_session.head(url, timeout=timeout, allow_redirects=True) as resp:
+                    if resp.status not in (405, 501):
+                        return resp.status == cfg.expected_status
+                self._needs_get.add(name)
+            async with self._aio_session.get(url, timeout=timeout, allow_redirects=True) as resp:
+                return resp.status == cfg.expected_status
+        except Exception:
+            return False
+
+    async def _check_sites_gather(self, site_targets) -> List[tuple]:
+        if self._aio_session is None or self._aio_session.closed:
+            connector = aiohttp.TCPConnector(limit=100, ttl_dns_cache=300,
+                                             keepalive_timeout=60, ssl=False)
+            self._aio_session = aiohttp.ClientSession(connector=connector)
+        oks = await asyncio.gather(*[self._check_site_async(n, c) for n, c in site_targets])
+        return [(name, ok) for (name, _), ok in zip(site_targets, oks)]
+
+    def _check_sites_async(self, site_targets) -> List[tuple]:
+        """在持久事件循环上并发探测所有站点，返回 [(name, is_ok)]"""
+        if self._aio_loop is None:
+            self._aio_loop = asyncio.new_event_loop()
+        return self._aio_loop.run_until_complete(self._check_sites_gather(site_targets))
+
+    def _check_one_pool(self, name, cfg, pool_states: Dict[str, str]) -> bool:
+        """检测单个应用池是否运行中 (读取本周期的批量快照)"""
+        try:
+            return pool_states.get(name, "Unknown") == "Started"
+        except Exception as e:
+            self.logger.log(f"检查应用池 {name} 异常: {e}", "ERROR")
+            return False
+
+    def _snapshot_pool_states(self) -> Dict[str, str]:
+        """一次 'list apppool' 拿到所有应用池状态，避免每个池fork一次appcmd"""
+        return {p["name"]: p["state"] for p in get_iis_app_pools()}
+
+    def _snapshot_site_bindings(self, names: List[str]):
+        """一次 'list site' 补全缺少URL的站点绑定缓存"""
+        pending = set(names)
+        for site in get_iis_sites():
+            if site["name"] in pending:
+                url = parse_bindings_url(site["bindings"])
+                if url:
+                    self._binding_url_cache[site["name"]] = url
+
     def _check_cycle(self):
         current_time = datetime.now().strftime("%H:%M:%S")
         self.status.total_checks += 1
-        # 检查网站
-        for name, cfg in self.config_manager.websites.items():
-            if not cfg.enabled: continue
-            try:
-                import requests
-                url = cfg.url if cfg.url else get_site_bindings_url(name)
-                if not url: url = "http://localhost"
-                
-                resp = requests.get(url, timeout=cfg.check_timeout, verify=False, allow_redirects=True)
-                is_ok = resp.status_code == cfg.expected_status
-                
-                with self.lock:
-                    if name not in self.website_status: self.website_status[name] = {"status": "unknown", "fail_count": 0}
-                    stat = self.website_status[name]
-                    stat["last_check"] = current_time
-                    stat["total_checks"] += 1
-                    
-                    if is_ok:
-                        stat["status"] = "ok"
-                        stat["fail_count"] = 0
-                    else:
-                        stat["status"] = "error"
-                        stat["fail_count"] += 1
-                        self._handle_failure(name, "网站", stat)
-                        
-            except Exception as e:
-                with self.lock:
-                    if name not in self.website_status: self.website_status[name] = {"status": "unknown", "fail_count": 0}
-                    stat = self.website_status[name]
-                    stat["status"] = "error"
-                    stat["fail_count"] += 1
-                    stat["last_check"] = current_time
-                    self._handle_failure(name, "网站", stat)
-
-        # 检查应用池
+
+        if not self.pool:
+            return
+
+        # 每周期各查询一次appcmd批量状态，替代每个目标一次fork
+        need_binding = [name for name, cfg in self.config_manager.websites.items()
+                        if cfg.enabled and not cfg.url and name not in self._binding_url_cache]
+        if need_binding:
+            self._snapshot_site_bindings(need_binding)
+        pool_states: Dict[str, str] = {}
+        if any(cfg.enabled for cfg in self.config_manager.app_pools.values()):
+            pool_states = self._snapshot_pool_states()
+
+        site_targets = [(n, c) for n, c in self.config_manager.websites.items() if c.enabled]
+
+        # 并发提交所有检测任务 (网络等待和subprocess等待互相重叠)
+        futures = {}
         for name, cfg in self.config_manager.app_pools.items():
             if not cfg.enabled: continue
-            try:
-                state = get_app_pool_state(name)
-                is_ok = state == "Started"
-                
-                with self.lock:
-                    if name not in self.apppool_status: self.apppool_status[name] = {"status": "unknown", "fail_count": 0}
-                    stat = self.apppool_status[name]
-                    stat["last_check"] = current_time
-                    stat["total_checks"] += 1
-                    
-                    if is_ok:
-                        stat["status"] = "running"
-                        stat["fail_count"] = 0
-                    else:
-                        stat["status"] = "stopped"
-                        stat["fail_count"] += 1
-                        self._handle_failure(name, "应用池", stat)
-                        
-            except Exception as e:
-                self.logger.log(f"检查应用池 {name} 异常: {e}", "ERROR")
+            futures[self.pool.submit(self._check_one_pool, name, cfg, pool_states)] = ("应用池", name)
+
+        results = []  # [(type_name, name, is_ok)]
+        if aiohttp is not None and site_targets:
+            # 单线程事件循环并发全部HTTP探测
+            for name, is_ok in self._check_sites_async(site_targets):
+                results.append(("网站", name, is_ok))
+        else:
+            for name, cfg in site_targets:
+                futures[self.pool.submit(self._check_one_site, name, cfg)] = ("网站", name)
+
+        for future in as_completed(futures):
+            type_name, name = futures[future]
+            results.append((type_name, name, future.result()))
+
+        # 写时复制：在本地副本上累积全部变更，最后整体原子发布
+        # (CPython下字典引用赋值是原子的，读者拿引用无需加锁)
+        new_ws = {k: dict(v) for k, v in self.website_status.items()}
+        new_ps = {k: dict(v) for k, v in self.apppool_status.items()}
+
+        for type_name, name, is_ok in results:
+            is_site = type_name == "网站"
+            status_map = new_ws if is_site else new_ps
+            ok_label = "ok" if is_site else "running"
+            fail_label = "error" if is_site else "stopped"
+
+            if name not in status_map:
+                status_map[name] = {"status": "unknown", "fail_count": 0, "last_check": "-", "total_checks": 0}
+            stat = status_map[name]
+            stat["last_check"] = current_time
+            stat["total_checks"] = stat.get("total_checks", 0) + 1
+
+            if is_ok:
+                stat["status"] = ok_label
+                stat["fail_count"] = 0
+            else:
+                stat["status"] = fail_label
+                stat["fail_count"] += 1
+                self._handle_failure(name, type_name, stat)
+
+        self.website_status = new_ws
+        self.apppool_status = new_ps
+        if results:
+            self._rows_version += 1
 
     def _handle_failure(self, name, type_name, stat):
-            self.status.total_failures += 1
-        
+            with self.lock:  # 计数器仍然加锁保护
+                self.status.total_failures += 1
+
             # 判断是否达到最大失败次数
             if stat["fail_count"] >= self.config_manager.max_failures:
                 if self.config_manager.global_auto_restart:
@@ -449,7 +889,8 @@ class IISMonitor:
                         # 只有当网站配置中启用了监控时才重启 (默认为True)
                         if name in self.config_manager.websites:
                             if restart_website(name):
-                                self.status.total_restarts += 1
+                                with self.lock:
+                                    self.status.total_restarts += 1
                                 restart_success = True
                                 self.logger.log(f"✅ 网站 {name} 重启成功", "INFO")
                             else:
@@ -459,7 +900,8 @@ class IISMonitor:
                         # 只有当应用池配置中启用了监控时才重启 (默认为True)
                         if name in self.config_manager.app_pools:
                             if restart_app_pool(name):
-                                self.status.total_restarts += 1
+                                with self.lock:
+                                    self.status.total_restarts += 1
                                 restart_success = True
                                 self.logger.log(f"✅ 应用池 {name} 重启成功", "INFO")
                             else:
@@ -473,25 +915,19 @@ class IISMonitor:
     def get_status_snapshot(self):
         """
         获取状态快照 (用于UI更新)
-        加上锁超时，防止UI卡死
+        状态字典由监控线程整体替换发布，这里只读引用，无需加锁，UI不会被阻塞。
+        websites/pools 返回只读视图 (O(1)，不复制)，调用方不得修改
         """
         try:
-            acquired = self.lock.acquire(timeout=0.1) # 100ms超时
-            if not acquired:
-                return None # 如果获取锁失败，跳过本次更新
-                
-            try:
-                return {
-                    "monitor": asdict(self.status),
-                    "websites": dict(self.website_status),
-                    "pools": dict(self.apppool_status),
-                    "config": {
-                        "interval": self.config_manager.check_interval,
-                        "max_fail": self.config_manager.max_failures
-                    }
+            return {
+                "monitor": asdict(self.status),
+                "websites": MappingProxyType(self.website_status),
+                "pools": MappingProxyType(self.apppool_status),
+                "config": {
+                    "interval": self.config_manager.check_interval,
+                    "max_fail": self.config_manager.max_failures
                 }
-            finally:
-                self.lock.release()
+            }
         except Exception:
             return None
 
@@ -502,7 +938,7 @@ monitor = IISMonitor()
 
 def get_safe_json_dump(data):
     try:
-        return json.dumps(data, indent=2, ensure_ascii=False)
+        return _dumps(data)
     except:
         return "{}"
 def refresh_sites_with_status():
@@ -545,101 +981,201 @@ def refresh_iis_info(type_):
     except Exception as e:
         return f"读取失败: {str(e)}"
 
-def update_ui():
-    """核心UI更新函数，防止卡死"""
+# update_ui 的diff缓存：每个浏览器会话一份，由 gr.State 随 timer.tick 往返。
+# 定时器和组件值都是会话级的，缓存若做成模块级，变化会被先触发tick的会话
+# 消费掉，其他并发打开的页面就永远停在旧画面
+def _new_ui_diff_state() -> dict:
+    """一个会话的diff缓存初值 (gr.State 按会话深拷贝本结构)"""
+    return {
+        "rows": -1,        # 上次渲染的状态表版本号
+        "logs": -1,        # 上次渲染的日志序号
+        "web": None,       # 上次发送的网站表内容 (列元组形式)
+        "pool": None,      # 上次发送的应用池表内容
+        "hashes": {},      # 文本槽位的内容哈希，没变的不进blob
+        "idle": 0,         # 连续整轮无变化的tick计数，空闲降频用
+        "stopped": False,  # 停止画面是否已渲染，渲染过后整轮跳过
+    }
+
+# 首屏结果整包缓存：多标签页/刷新风暴在TTL窗口内共享同一份结果，
+# 锁负责去重并发的首次加载——后到的请求等先到的算完直接复用
+_load_cache = {"t": 0.0, "val": None}
+_load_lock = asyncio.Lock()
+
+def _invalidate_load_cache():
+    """配置保存后调用：作废首屏缓存，下次页面加载读到的一定是新配置"""
+    _load_cache["val"] = None
+_UI_ACTIVE_INTERVAL = 1.0
+_UI_IDLE_INTERVAL = 3.0
+_UI_IDLE_THRESHOLD = 5
+
+def _hash_output(value) -> bytes:
+    return hashlib.blake2b(repr(value).encode("utf-8", "replace"), digest_size=8).digest()
+
+# 统计文本的格式模板：模块级定好，每tick用 format_map 直接套快照字典，
+# 不在热路径里反复构造f-string的格式化逻辑
+_STAT_TEMPLATES = (
+    "{total_checks} 次",
+    "{total_failures} 次",
+    "{total_restarts} 次",
+)
+_CONF_TEMPLATES = (
+    "{interval} 秒",
+    "{max_fail} 次",
+)
+
+# 文本槽位对应的前端 elem_id：打包进隐藏JSON后由前端JS一次性分发
+_UI_SCALAR_IDS = (
+    "mon-status", "mon-runtime", "mon-checks", "mon-fails",
+    "mon-restarts", "mon-interval", "mon-maxfail",
+)
+
+# 前端分发脚本：隐藏JSON变化时把各字段写进对应文本框，
+# 一次websocket消息更新全部文本槽位，免去逐组件的渲染往返
+_UI_FANOUT_JS = """
+(blob) => {
+    if (!blob) { return; }
+    for (const [id, val] of Object.entries(blob)) {
+        const el = document.querySelector('#' + id + ' textarea');
+        if (el && el.value !== val) {
+            el.value = val;
+        }
+    }
+}
+"""
+
+def update_ui(st):
+    """核心UI更新函数，防止卡死。st 为本会话的diff缓存，随tick往返"""
+    if st is None:
+        st = _new_ui_diff_state()
     snapshot = monitor.get_status_snapshot()
-    
+
     if not snapshot:
         # 如果获取不到数据（锁被占用），返回当前值或占位符
-        return gr.skip() 
-    
+        return gr.skip()
+
     mon = snapshot["monitor"]
-    
+
+    # 监控停止后把"已停止"画面渲染出来一次，之后整轮跳过——但配置保存
+    # 仍会推进状态表版本号/日志序号，版本动了就照常走完整的diff流程
+    if mon["status"] == "running":
+        st["stopped"] = False
+    elif st["stopped"] and monitor._rows_version == st["rows"] and monitor.logger.seq == st["logs"]:
+        return gr.skip()
+
     status_text = "🟢 运行中" if mon["status"] == "running" else "🔴 已停止"
     runtime = format_duration(mon["uptime_seconds"])
-    
-    # 构建网站表格
-    website_rows = []
-    for name, conf in monitor.config_manager.websites.items():
-        stat = snapshot["websites"].get(name, {})
-        website_rows.append([
-            name,
-            conf.url,
-            stat.get("status", "-"),
-            stat.get("fail_count", 0),
-            stat.get("last_check", "-")
-        ])
-        
-    # 构建应用池表格
-    pool_rows = []
-    for name, conf in monitor.config_manager.app_pools.items():
-        stat = snapshot["pools"].get(name, {})
-        pool_rows.append([
-            name,
-            stat.get("status", "-"),
-            stat.get("fail_count", 0),
-            stat.get("last_check", "-")
-        ])
-        
-    logs = "\n".join(monitor.logger.get_recent_logs(50))
-    
-    return (
+
+    # 状态表仅在版本号变化时重建，否则跳过重绘
+    changed = False
+    rows_version = monitor._rows_version
+    if rows_version == st["rows"]:
+        website_rows = gr.skip()
+        pool_rows = gr.skip()
+    else:
+        st["rows"] = rows_version
+        # 构建网站表格：单遍填充列数组 (SoA)，避免逐行小列表的分配
+        web_names, web_urls, web_stats, web_fails, web_checks = [], [], [], [], []
+        for name, conf in monitor.config_manager.websites.items():
+            stat = snapshot["websites"].get(name, {})
+            web_names.append(name)
+            web_urls.append(conf.url)
+            web_stats.append(stat.get("status", "-"))
+            web_fails.append(stat.get("fail_count", 0))
+            web_checks.append(stat.get("last_check", "-"))
+
+        # 构建应用池表格
+        pool_names, pool_stats, pool_fails, pool_checks = [], [], [], []
+        for name, conf in monitor.config_manager.app_pools.items():
+            stat = snapshot["pools"].get(name, {})
+            pool_names.append(name)
+            pool_stats.append(stat.get("status", "-"))
+            pool_fails.append(stat.get("fail_count", 0))
+            pool_checks.append(stat.get("last_check", "-"))
+
+        # 版本号变了不代表行内容真的变了：逐表与上次发送的内容比对
+        web_key = (tuple(web_names), tuple(web_urls), tuple(web_stats), tuple(web_fails), tuple(web_checks))
+        if web_key == st["web"]:
+            website_rows = gr.skip()
+        else:
+            st["web"] = web_key
+            changed = True
+            # type="array" 的Dataframe直接吃行数组，跳过pandas的构造和序列化
+            website_rows = list(map(list, zip(web_names, web_urls, web_stats, web_fails, web_checks)))
+
+        pool_key = (tuple(pool_names), tuple(pool_stats), tuple(pool_fails), tuple(pool_checks))
+        if pool_key == st["pool"]:
+            pool_rows = gr.skip()
+        else:
+            st["pool"] = pool_key
+            changed = True
+            pool_rows = list(map(list, zip(pool_names, pool_stats, pool_fails, pool_checks)))
+
+    # 文本类输出统一打包进隐藏JSON，由前端JS分发；只放入有变化的槽位
+    blob = {}
+
+    # 日志按序号判断有无新内容
+    log_seq = monitor.logger.seq
+    if log_seq != st["logs"]:
+        changed = True
+        st["logs"] = log_seq
+        blob["mon-logs"] = "\n".join(monitor.logger.get_recent_logs(50))
+
+    # 文本槽位按内容哈希判断，没变的不进blob
+    scalars = (
         status_text,
         runtime,
-        f"{mon['total_checks']} 次",
-        f"{mon['total_failures']} 次",
-        f"{mon['total_restarts']} 次",
-        f"{snapshot['config']['interval']} 秒",
-        f"{snapshot['config']['max_fail']} 次",
+        *(t.format_map(mon) for t in _STAT_TEMPLATES),
+        *(t.format_map(snapshot["config"]) for t in _CONF_TEMPLATES),
+    )
+    for i, value in enumerate(scalars):
+        h = _hash_output(value)
+        if st["hashes"].get(i) != h:
+            st["hashes"][i] = h
+            blob[_UI_SCALAR_IDS[i]] = value
+            changed = True
+
+    # 空闲降频：连续多轮全无变化就把定时器放慢，有变化立即恢复
+    if changed:
+        timer_update = gr.Timer(value=_UI_ACTIVE_INTERVAL) if st["idle"] >= _UI_IDLE_THRESHOLD else gr.skip()
+        st["idle"] = 0
+    else:
+        st["idle"] += 1
+        timer_update = gr.Timer(value=_UI_IDLE_INTERVAL) if st["idle"] == _UI_IDLE_THRESHOLD else gr.skip()
+
+    # 本tick已把停止画面发给前端，下个tick起整体跳过直到重新启动
+    if mon["status"] != "running":
+        st["stopped"] = True
+
+    return (
+        st,
+        blob if blob else gr.skip(),
         website_rows,
         pool_rows,
-        logs
+        timer_update
     )
 
 def initialize_page():
     """页面初始化，自动加载已保存的配置"""
     try:
-        print(">>> 开始初始化页面...")
-        
+        logger.debug("开始初始化页面...")
+
         # 1. 刷新IIS信息
         sites_txt = refresh_sites_with_status()
         pools_txt = refresh_iis_info("pool")
         
-        # 2. 处理网站配置
-        web_final = {}
-        if monitor.config_manager.websites:
-            for name, conf_obj in monitor.config_manager.websites.items():
-                attrs = vars(conf_obj)
-                # 补全字段
-                attrs.setdefault("url", "")
-                attrs.setdefault("enabled", True)
-                attrs.setdefault("check_timeout", 10)
-                attrs.setdefault("expected_status", 200)
-                web_final[name] = attrs
-        print(f">>> 已读取网站配置数量: {len(web_final)}")
-
-        # 3. 处理应用池配置
-        pool_final = {}
-        if monitor.config_manager.app_pools:
-            for name, conf_obj in monitor.config_manager.app_pools.items():
-                attrs = vars(conf_obj)
-                attrs.setdefault("enabled", True)
-                attrs.setdefault("auto_restart", True)
-                attrs.setdefault("restart_delay", 5)
-                pool_final[name] = attrs
-        print(f">>> 已读取应用池配置数量: {len(pool_final)}")
-
-        # 4. 转换为 JSON 字符串
+        # 2-4. 配置JSON直接取ConfigManager的缓存串 (保存/加载时已生成)
         # 如果没有配置，生成带提示的空 JSON，而不是 "{}"，方便用户编辑
-        web_json = json.dumps(web_final, indent=2, ensure_ascii=False) if web_final else '{\n  \n}'
-        pool_json = json.dumps(pool_final, indent=2, ensure_ascii=False) if pool_final else '{\n  \n}'
-        
+        web_json = monitor.config_manager.web_json() if monitor.config_manager.websites else _EMPTY_CONF_JSON
+        pool_json = monitor.config_manager.pool_json() if monitor.config_manager.app_pools else _EMPTY_CONF_JSON
+        logger.debug("已读取网站配置数量: %d", len(monitor.config_manager.websites))
+        logger.debug("已读取应用池配置数量: %d", len(monitor.config_manager.app_pools))
+
         # 5. 获取全局参数
         interval = monitor.config_manager.check_interval
         max_fail = monitor.config_manager.max_failures
         auto_restart = monitor.config_manager.global_auto_restart
         
-        print(f">>> 全局参数: Interval={interval}, Fail={max_fail}, Restart={auto_restart}")
+        logger.debug("全局参数: Interval=%s, Fail=%s, Restart=%s", interval, max_fail, auto_restart)
         
         # 6. 返回结果，顺序必须严格匹配 demo.load 的 outputs 列表
         return (
@@ -652,10 +1188,8 @@ def initialize_page():
             pools_txt       # 7. txt_avail_pools
         )
         
-    except Exception as e:
-        import traceback
-        print(f"❌ 初始化严重错误: {e}")
-        traceback.print_exc()
+    except Exception:
+        logger.exception("初始化严重错误")
         return ("加载出错", "加载出错", 60, 3, True, "出错", "出错")
 
 
@@ -667,8 +1201,10 @@ def save_web_config_json(json_str):
         if not json_str or json_str.strip() == "":
             json_str = "{}"
             
-        data = json.loads(json_str)
+        data = _loads(json_str)
         monitor.config_manager.websites.clear()
+        # 配置正在改写，先作废缓存，避免并发页面加载拿到旧字符串
+        monitor.config_manager.invalidate_json_caches()
         
         # 统计信息
         success_count = 0
@@ -710,9 +1246,12 @@ def save_web_config_json(json_str):
         
         # 保存到配置文件
         monitor.config_manager.save()
+        invalidate_iis_cache()
+        _invalidate_load_cache()
         
-        # 重新初始化状态
+        # 重新初始化状态，并唤醒监控循环立即应用新配置
         monitor._init_status()
+        monitor.wake.set()
         
         # 构建结果消息
         result_msg = f"✅ 网站配置已保存\n"
@@ -726,7 +1265,7 @@ def save_web_config_json(json_str):
         
         return result_msg
         
-    except json.JSONDecodeError as e:
+    except ValueError as e:  # orjson/json 的 JSONDecodeError 均为 ValueError 子类
         error_msg = f"❌ JSON格式错误: {str(e)}\n\n请确保输入的是有效的JSON格式"
         print(error_msg)
         return error_msg
@@ -742,8 +1281,10 @@ def save_pool_config_json(json_str):
         if not json_str or json_str.strip() == "":
             json_str = "{}"
             
-        data = json.loads(json_str)
+        data = _loads(json_str)
         monitor.config_manager.app_pools.clear()
+        # 配置正在改写，先作废缓存，避免并发页面加载拿到旧字符串
+        monitor.config_manager.invalidate_json_caches()
         
         # 统计信息
         success_count = 0
@@ -784,9 +1325,12 @@ def save_pool_config_json(json_str):
         
         # 保存到配置文件
         monitor.config_manager.save()
+        invalidate_iis_cache()
+        _invalidate_load_cache()
         
-        # 重新初始化状态
+        # 重新初始化状态，并唤醒监控循环立即应用新配置
         monitor._init_status()
+        monitor.wake.set()
         
         # 构建结果消息
         result_msg = f"✅ 应用池配置已保存\n"
@@ -800,7 +1344,7 @@ def save_pool_config_json(json_str):
         
         return result_msg
         
-    except json.JSONDecodeError as e:
+    except ValueError as e:  # orjson/json 的 JSONDecodeError 均为 ValueError 子类
         error_msg = f"❌ JSON格式错误: {str(e)}\n\n请确保输入的是有效的JSON格式"
         print(error_msg)
         return error_msg
@@ -813,9 +1357,8 @@ def save_pool_config_json(json_str):
 # 界面构建
 # ============================================
 
-# 创建两个状态变量，用于在后台存储配置
-web_conf_state = gr.State(value={})
-pool_conf_state = gr.State(value={})
+# 保存成功的提示串固定不变，定义一次复用
+_GLOBAL_SAVED_MSG = "✅ 全局配置已保存"
 
 with gr.Blocks(title="IIS Monitor") as demo:
     gr.Markdown("# 🛠️ IIS 监控管理系统")
@@ -824,27 +1367,37 @@ with gr.Blocks(title="IIS Monitor") as demo:
         with gr.Tab("📊 监控面板"):
             with gr.Row():
                 with gr.Column(scale=1):
-                    status_box = gr.Textbox(label="当前状态", value="未启动", interactive=False)
+                    status_box = gr.Textbox(label="当前状态", value="未启动", interactive=False, elem_id="mon-status")
                     with gr.Row():
                         btn_start = gr.Button("▶️ 启动", variant="primary")
                         btn_stop = gr.Button("⏹️ 停止", variant="stop")
-                    
+
                     gr.Markdown("### 统计")
-                    txt_runtime = gr.Textbox(label="运行时长", interactive=False)
-                    txt_checks = gr.Textbox(label="总检测", interactive=False)
-                    txt_fails = gr.Textbox(label="总失败", interactive=False)
-                    txt_restarts = gr.Textbox(label="总重启", interactive=False)
-                    txt_interval = gr.Textbox(label="检测间隔", interactive=False)
-                    txt_maxfail = gr.Textbox(label="失败阈值", interactive=False)
+                    txt_runtime = gr.Textbox(label="运行时长", interactive=False, elem_id="mon-runtime")
+                    txt_checks = gr.Textbox(label="总检测", interactive=False, elem_id="mon-checks")
+                    txt_fails = gr.Textbox(label="总失败", interactive=False, elem_id="mon-fails")
+                    txt_restarts = gr.Textbox(label="总重启", interactive=False, elem_id="mon-restarts")
+                    txt_interval = gr.Textbox(label="检测间隔", interactive=False, elem_id="mon-interval")
+                    txt_maxfail = gr.Textbox(label="失败阈值", interactive=False, elem_id="mon-maxfail")
                     
                 with gr.Column(scale=2):
                     gr.Markdown("### 🌐 网站状态")
-                    df_websites = gr.Dataframe(headers=["名称", "URL", "状态", "失败", "最后检测"], label="网站列表")
+                    # type="array" 直接收发行数组，省去服务端pandas转换
+                    df_websites = gr.Dataframe(
+                        headers=["名称", "URL", "状态", "失败", "最后检测"], label="网站列表",
+                        datatype=["str", "str", "str", "number", "str"], type="array",
+                    )
                     gr.Markdown("### 🏊 应用池状态")
-                    df_pools = gr.Dataframe(headers=["名称", "状态", "失败", "最后检测"], label="应用池列表")
+                    df_pools = gr.Dataframe(
+                        headers=["名称", "状态", "失败", "最后检测"], label="应用池列表",
+                        datatype=["str", "str", "number", "str"], type="array",
+                    )
                     
             with gr.Accordion("📋 日志", open=False):
-                txt_logs = gr.Textbox(lines=10, interactive=False)
+                txt_logs = gr.Textbox(lines=10, interactive=False, elem_id="mon-logs")
+
+            # 隐藏的文本输出聚合槽：定时器只写这一个组件，前端JS负责分发
+            ui_blob = gr.JSON(visible=False)
 
         with gr.Tab("⚙️ 配置") as config_tab:
             with gr.Row():
@@ -854,20 +1407,7 @@ with gr.Blocks(title="IIS Monitor") as demo:
                     txt_avail_sites_status = gr.Textbox(label="可用网站", lines=8, interactive=False,placeholder="点击刷新按钮获取...")
                     
                     gr.Markdown("### 2. 网站监控配置")
-                    txt_web_conf = gr.Textbox(label="JSON配置", lines=8, placeholder="""{
-	"Example Web Site": {
-		"url": "http://localhost:80",
-		"enabled": true,
-		"check_timeout": 10,
-		"expected_status": 200
-	},
-	"ExampleWebsite": {
-		"url": "http://localhost:8080",
-		"enabled": true,
-		"check_timeout": 15,
-		"expected_status": 200
-	}
-}""")
+                    txt_web_conf = gr.Textbox(label="JSON配置", lines=8, placeholder=_EXAMPLE_WEB_JSON)
                     btn_save_web = gr.Button("💾 保存网站配置")
                     txt_web_status = gr.Textbox(label="结果", interactive=False)
                     
@@ -877,25 +1417,14 @@ with gr.Blocks(title="IIS Monitor") as demo:
                     txt_avail_pools = gr.Textbox(label="可用应用池", lines=8, interactive=False,placeholder="点击刷新按钮获取...")
                     
                     gr.Markdown("### 2. 应用池监控配置")
-                    txt_pool_conf = gr.Textbox(label="JSON配置", lines=8, placeholder="""{
-	"ExampleAppPool": {
-		"enabled": true,
-		"auto_restart": true,
-		"restart_delay": 5
-	},
-	"MyExampleAppPool": {
-		"enabled": true,
-		"auto_restart": true,
-		"restart_delay": 10
-	}
-}""")
+                    txt_pool_conf = gr.Textbox(label="JSON配置", lines=8, placeholder=_EXAMPLE_POOL_JSON)
                     btn_save_pool = gr.Button("💾 保存应用池配置")
                     txt_pool_status = gr.Textbox(label="结果", interactive=False)
             
             gr.Markdown("### 3. 全局参数")
             with gr.Row():
-                sld_interval = gr.Slider(10, 300, value=60, label="检测间隔(秒)")
-                sld_fail = gr.Slider(1, 10, value=3, label="最大失败次数")
+                sld_interval = gr.Slider(10, 300, value=60, step=1, label="检测间隔(秒)")
+                sld_fail = gr.Slider(1, 10, value=3, step=1, label="最大失败次数")
                 chk_restart = gr.Checkbox(value=True, label="允许自动重启")
             btn_save_global = gr.Button("💾 保存全局设置")
             txt_global_status = gr.Textbox(label="结果", interactive=False)
@@ -919,134 +1448,120 @@ with gr.Blocks(title="IIS Monitor") as demo:
     
     def save_global(interval, fail, restart):
         try:
-            monitor.config_manager.check_interval = int(interval)
-            monitor.config_manager.max_failures = int(fail)
-            monitor.config_manager.global_auto_restart = restart
-            monitor.config_manager.save()
-            return "✅ 全局配置已保存"
-        except Exception as e:
+            cm = monitor.config_manager
+            with cm.batch_update():
+                # step=1 的滑块送来的仍是float，int() 保证落盘的JSON是整数
+                cm.check_interval = int(interval)
+                cm.max_failures = int(fail)
+                cm.global_auto_restart = restart
+                cm.invalidate_json_caches()
+            _invalidate_load_cache()
+            # 推进版本号：监控停着时UI靠它判断要不要重绘，间隔/阈值框才能刷新
+            monitor._rows_version += 1
+            return _GLOBAL_SAVED_MSG
+        except (ValueError, TypeError) as e:
             return f"❌ 失败: {e}"
             
-    btn_save_global.click(save_global, inputs=[sld_interval, sld_fail, chk_restart], outputs=[txt_global_status])
+    # 快速处理器不排队也不放进度动画，省一次队列往返和前端遮罩渲染
+    btn_save_global.click(
+        save_global,
+        inputs=[sld_interval, sld_fail, chk_restart],
+        outputs=[txt_global_status],
+        queue=False,
+        show_progress="hidden",
+    )
     
     # 定时器 (每1秒更新一次UI，使用了skip逻辑优化性能)
-    timer = gr.Timer(1.0)
+    # diff缓存放在会话级State里随tick往返：新开/刷新的页面从初值起步，
+    # 自带一次全量渲染，多个并发会话的diff互不干扰
+    ui_diff_state = gr.State(value=_new_ui_diff_state())
+    timer = gr.Timer(_UI_ACTIVE_INTERVAL)
     timer.tick(
         update_ui,
-        outputs=[
-            status_box, txt_runtime, txt_checks, txt_fails, txt_restarts, 
-            txt_interval, txt_maxfail, df_websites, df_pools, txt_logs
-        ]
+        inputs=[ui_diff_state],
+        outputs=[ui_diff_state, ui_blob, df_websites, df_pools, timer]
     )
+    # 文本槽位由前端按elem_id分发，不走服务端逐组件更新
+    ui_blob.change(fn=None, inputs=[ui_blob], js=_UI_FANOUT_JS)
     # 最简单的解决方案 - 在页面加载时就完成所有初始化
-    def initialize_all_on_load():
-        """页面加载时一次性初始化所有内容"""
-        try:
-            # 1. 获取IIS信息
-            sites_txt = refresh_sites_with_status()
-            pools_txt = refresh_iis_info("pool")
-        
-            # 2. 加载网站配置
-            web_final = {}
-            for name, conf_obj in monitor.config_manager.websites.items():
-                attrs = vars(conf_obj)
-                attrs.setdefault("url", "")
-                attrs.setdefault("enabled", True)
-                attrs.setdefault("check_timeout", 10)
-                attrs.setdefault("expected_status", 200)
-                web_final[name] = attrs
-        
-            # 3. 加载应用池配置
-            pool_final = {}
-            for name, conf_obj in monitor.config_manager.app_pools.items():
-                attrs = vars(conf_obj)
-                attrs.setdefault("enabled", True)
-                attrs.setdefault("auto_restart", True)
-                attrs.setdefault("restart_delay", 5)
-                pool_final[name] = attrs
-        
-            # 4. 转换为JSON
-            web_json = json.dumps(web_final, indent=2, ensure_ascii=False) if web_final else '{\n  \n}'
-            pool_json = json.dumps(pool_final, indent=2, ensure_ascii=False) if pool_final else '{\n  \n}'
-        
-            # 5. 全局设置
-            interval = monitor.config_manager.check_interval
-            max_fail = monitor.config_manager.max_failures
-            auto_restart = monitor.config_manager.global_auto_restart
-        
-            print(f">>> 初始化完成: {len(web_final)}个网站, {len(pool_final)}个应用池")
-
-            # 如果没有配置，提供友好的示例
-            if len(web_final)==0:
-                # web_final = {
-                #     "Example Web Site": {
-                #         "url": "http://localhost:80",
-                #         "enabled": true,
-                #         "check_timeout": 10,
-                #         "expected_status": 200
-                #     },
-                #     "ExampleWebsite": {
-                #         "url": "http://localhost:8080",
-                #         "enabled": true,
-                #         "check_timeout": 15,
-                #         "expected_status": 200
-                #     }
-                # }
-                # web_json = json.dumps(web_final, indent=2, ensure_ascii=False)
-                web_json=None
-                print(">>> 网站配置为空，显示示例配置")
-            
-            
-            # 如果没有配置，提供友好的示例
-            if len(pool_final)==0:
-                # pool_final = {
-                #     "ExampleAppPool": {
-                #         "enabled": true,
-                #         "auto_restart": true,
-                #         "restart_delay": 5
-                #     },
-                #     "MyExampleAppPool": {
-                #         "enabled": true,
-                #         "auto_restart": true,
-                #         "restart_delay": 10
-                #     }
-                # }
-                # pool_json = json.dumps(pool_final, indent=2, ensure_ascii=False)
-                pool_json=None
-                print(">>> 应用池配置为空，显示示例配置")
-            
-            return (
-                web_json, pool_json, interval, max_fail, auto_restart, 
-                sites_txt, pools_txt, interval, max_fail, "未启动"
-            )
-        
-        except Exception as e:
-            print(f"初始化错误: {e}")
-            return ("{}", "{}", 60, 3, True, "初始化失败", "初始化失败", 60, 3, "未启动")
+    async def initialize_all_on_load():
+        """页面加载时一次性初始化所有内容 (async处理器，带TTL缓存)"""
+        ttl = max(1.0, monitor.config_manager.check_interval / 2)
+        async with _load_lock:
+            if _load_cache["val"] is not None and time.monotonic() - _load_cache["t"] < ttl:
+                return _load_cache["val"]
+            try:
+                # 1. 并发获取IIS信息：耗时取两次调用的最大值而非总和
+                sites_txt, pools_txt = await asyncio.gather(
+                    asyncio.to_thread(refresh_sites_with_status),
+                    asyncio.to_thread(refresh_iis_info, "pool"),
+                )
 
-    # 一次性初始化所有
+                # 2. 全局设置 (配置JSON不在首屏渲染：切到配置Tab时
+                # 由 refresh_lists_on_tab_click 从 ConfigManager 缓存现取)
+                cm = monitor.config_manager
+                interval = cm.check_interval
+                max_fail = cm.max_failures
+                auto_restart = cm.global_auto_restart
+
+                logger.debug("初始化完成: %d个网站, %d个应用池", len(cm.websites), len(cm.app_pools))
+
+                result = (
+                    interval, max_fail, auto_restart,
+                    sites_txt, pools_txt, interval, max_fail, "未启动"
+                )
+                # 只缓存成功结果，失败的下次重试
+                _load_cache["val"] = result
+                _load_cache["t"] = time.monotonic()
+                return result
+
+            except Exception:
+                logger.exception("初始化错误")
+                return (60, 3, True, "初始化失败", "初始化失败", 60, 3, "未启动")
+
+    # 一次性初始化所有 (配置JSON不占首屏输出)
     demo.load(
         fn=initialize_all_on_load,
         outputs=[
-            txt_web_conf, txt_pool_conf, sld_interval, sld_fail, chk_restart,
+            sld_interval, sld_fail, chk_restart,
             txt_avail_sites_status , txt_avail_pools, txt_interval, txt_maxfail, txt_runtime
-        ]
+        ],
+        queue=False,
+        show_progress="hidden",
     )
     
     # 配置Tab点击时只刷新IIS列表（可选，如果觉得每次点击都刷新太频繁可以去掉）
-    def refresh_lists_on_tab_click():
-        """点击配置Tab时刷新列表"""
-        sites = refresh_sites_with_status()
-        pools = refresh_iis_info("pool")
-        return sites, pools
+    # 防抖：5秒窗口内的连续点击直接返回上次结果，避免连环触发appcmd
+    _last_tab_refresh = {"t": 0.0, "val": (None, None)}
+
+    async def refresh_lists_on_tab_click():
+        """点击配置Tab时刷新列表并填充配置文本框 (IIS查询带5秒防抖且并发执行)"""
+        now = time.monotonic()
+        if now - _last_tab_refresh["t"] < 5.0 and _last_tab_refresh["val"][0] is not None:
+            sites, pools = _last_tab_refresh["val"]
+        else:
+            sites, pools = await asyncio.gather(
+                asyncio.to_thread(refresh_sites_with_status),
+                asyncio.to_thread(refresh_iis_info, "pool"),
+            )
+            _last_tab_refresh["t"] = now
+            _last_tab_refresh["val"] = (sites, pools)
+        # 配置JSON不防抖：直接取 ConfigManager 的序列化缓存，保存后切Tab立即可见
+        cm = monitor.config_manager
+        web_json = cm.web_json() if cm.websites else None
+        pool_json = cm.pool_json() if cm.app_pools else None
+        return sites, pools, web_json, pool_json
 
     config_tab.select(
         fn=refresh_lists_on_tab_click,
-        outputs=[txt_avail_sites_status, txt_avail_pools]
+        outputs=[txt_avail_sites_status, txt_avail_pools, txt_web_conf, txt_pool_conf],
+        queue=False,
+        show_progress="hidden",
     )
     
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
     print("-" * 30)
     print("IIS监控启动中...")
     print(f"IIS监控已启动！本机可在浏览器中访问: http://localhost:7860")
-    demo.launch(server_name="0.0.0.0", server_port=7860,theme=gr.themes.Soft(),css=custom_css)
+    demo.launch(server_name="0.0.0.0", server_port=7860,theme=_THEME,css=custom_css)